@@ -1,12 +1,18 @@
 import streamlit as st
+import importlib
 
 class MultiApp:
     def __init__(self):
         self.apps = []
 
     def add_app(self, title, func):
+        # func: a callable, or a "package.module:function" string imported on first use
         self.apps.append({"title": title, "function": func})
 
     def run(self):
         app = st.sidebar.radio("Navigation", self.apps, format_func=lambda app: app["title"])
-        app["function"]()
+        func = app["function"]
+        if isinstance(func, str):
+            module_name, func_name = func.split(":")
+            func = getattr(importlib.import_module(module_name), func_name)
+        func()
@@ -1,10 +1,13 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import json
-import os
+import streamlit.components.v1 as components
+from utils.data import load_vuln_df, VULN_PARQUET
+from utils.maps import build_choropleth_html
+
+MAP_HEIGHT = 450  # height of the former Plotly maps
 
 def app():
+    import plotly.express as px
+
     st.title("Health Inequalities in France: Premature Mortality & Medical Accessibility")
 
     st.markdown("""
@@ -17,15 +20,9 @@ def app():
     """)
 
     # Load data
-    df = pd.read_csv(os.path.join(os.path.dirname(__file__), "..", "data", "dept_vulnerabilite_2022.csv"))
-    with open(os.path.join(os.path.dirname(__file__), "..", "data", "departements.geojson"), "r", encoding="utf-8") as f:
-        geojson_dept = json.load(f)
-
-    # Convert necessary columns
-    numeric_cols = ["mortalite_0_64", "apl_med", "z_mortalite_0_64", "vuln_apl_med", "score_vuln_global"]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = load_vuln_df(VULN_PARQUET)
     df = df.dropna(subset=["classe_vuln", "score_vuln_global"])
+    codes = tuple(df["code_dep"])
 
     # --- Section 1: Map of Premature Mortality ---
     st.header("1. Map of Premature Mortality (under age 65)")
@@ -36,18 +33,11 @@ def app():
     > High mortality rates may reflect limited access to healthcare, delayed diagnoses, or care avoidance in underserved regions.
     """)
 
-    fig_mortality = px.choropleth(
-        df,
-        geojson=geojson_dept,
-        locations="code_dep",
-        featureidkey="properties.code",
-        color="mortalite_0_64",
-        color_continuous_scale="Reds",
-        hover_name="departement",
-        labels={"mortalite_0_64": "Premature Mortality (‰)"}
+    html = build_choropleth_html(
+        codes, tuple(df["mortalite_0_64"]), "Reds", "Premature Mortality (‰)",
+        tooltip=True,
     )
-    fig_mortality.update_geos(fitbounds="locations", visible=False)
-    st.plotly_chart(fig_mortality, use_container_width=True)
+    components.html(html, height=MAP_HEIGHT)
 
     # --- Section 2: Map of APL ---
     st.header("2. Map of Healthcare Accessibility (APL)")
@@ -59,18 +49,11 @@ def app():
     Lower values may reflect **GP shortages** or **geographic isolation**.
     """)
 
-    fig_apl = px.choropleth(
-        df,
-        geojson=geojson_dept,
-        locations="code_dep",
-        featureidkey="properties.code",
-        color="apl_med",
-        color_continuous_scale="Blues",
-        hover_name="departement",
-        labels={"apl_med": "APL (GP Access)"}
+    html = build_choropleth_html(
+        codes, tuple(df["apl_med"]), "Blues", "APL (GP Access)",
+        tooltip=True,
     )
-    fig_apl.update_geos(fitbounds="locations", visible=False)
-    st.plotly_chart(fig_apl, use_container_width=True)
+    components.html(html, height=MAP_HEIGHT)
 
     # --- Section 3: National KPIs ---
     st.header("3. National Summary")
@@ -97,8 +80,11 @@ def app():
     - Color: APL (access to general practitioners)
     """)
 
-    top_vuln = df[df["classe_vuln"] == "Très élevée"].copy()
-    top_vuln = top_vuln.sort_values(by="mortalite_0_64", ascending=False)
+    # only the plotted/hovered columns end up in the figure JSON
+    top_vuln = df.loc[
+        df["classe_vuln"] == "Très élevée",
+        ["departement", "mortalite_0_64", "apl_med", "score_vuln_global"],
+    ].sort_values(by="mortalite_0_64", ascending=False)
 
     fig_bar = px.bar(
         top_vuln,
@@ -1,17 +1,45 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import folium
-from streamlit_folium import st_folium
-from sklearn.preprocessing import StandardScaler
-import os
+import numpy as np
+import streamlit.components.v1 as components
+from utils.data import load_vuln_df, VULN_PARQUET
+from utils.maps import build_choropleth_html
+from utils.scoring import vulnerability_score
+from utils.figures import get_fig
 
 MAP_HEIGHT = 400  # uniform height for all maps
+SENIOR_COLS = ["mortalite_65_plus", "apl_med", "apl_inf", "taux_pauvrete"]
+
+
+@st.cache_data(show_spinner=False)
+def kpis_65plus(path):
+    """Key indicators, top 5 and per-class means, computed once per data file."""
+    df = load_vuln_df(path).dropna(subset=SENIOR_COLS)
+
+    # one materialisation of the column, then plain NumPy reductions
+    m = df["mortalite_65_plus"].to_numpy()
+    dep_max, dep_min = df.iloc[m.argmax()], df.iloc[m.argmin()]
+    return {
+        "avg_mortality": round(m.mean(), 2),
+        "dep_max": dep_max,
+        "dep_min": dep_min,
+        "high_vuln_count": int(df["classe_vuln"].value_counts().get("Très élevée", 0)),
+        "max_min_diff": round(m.max() - m.min(), 2),
+        "high_mortality_count": int((m > 40).sum()),
+        "top5": (
+            df.nlargest(5, "mortalite_65_plus")[["departement", "mortalite_65_plus"]]
+            .reset_index(drop=True)
+        ),
+        "vuln_group": (
+            df.groupby("classe_vuln", observed=False)["mortalite_65_plus"].mean().round(2)
+            .dropna()
+        ),
+        "corr_score": round(df["score_vuln_global"].corr(df["mortalite_65_plus"]), 3),
+    }
 
 
 def app():
     """Streamlit page analysing mortality of seniors (65+) and related vulnerability metrics."""
+    from matplotlib import colormaps
 
     # ------------------------------------------------------------------
     # 🏷️  Page header
@@ -25,22 +53,17 @@ def app():
     # ------------------------------------------------------------------
     # 📥  Load data
     # ------------------------------------------------------------------
-    data_path = os.path.join(
-        os.path.dirname(__file__), "..", "data", "dept_vulnerabilite_2022.csv"
-    )
-    df = pd.read_csv(data_path).dropna(
-        subset=["mortalite_65_plus", "apl_med", "apl_inf", "taux_pauvrete"]
-    )
+    df = load_vuln_df(VULN_PARQUET).dropna(subset=SENIOR_COLS)
+    kpis = kpis_65plus(VULN_PARQUET)
 
     # ------------------------------------------------------------------
     # 🔢  Key indicators
     # ------------------------------------------------------------------
-    avg_mortality = round(df["mortalite_65_plus"].mean(), 2)
-    dep_max = df.loc[df["mortalite_65_plus"].idxmax()]
-    dep_min = df.loc[df["mortalite_65_plus"].idxmin()]
-    high_vuln_count = (df["classe_vuln"] == "Très élevée").sum()
-    max_min_diff = round(dep_max["mortalite_65_plus"] - dep_min["mortalite_65_plus"], 2)
-    high_mortality_count = (df["mortalite_65_plus"] > 40).sum()
+    avg_mortality = kpis["avg_mortality"]
+    dep_max, dep_min = kpis["dep_max"], kpis["dep_min"]
+    high_vuln_count = kpis["high_vuln_count"]
+    max_min_diff = kpis["max_min_diff"]
+    high_mortality_count = kpis["high_mortality_count"]
 
     st.subheader("📊 Key Indicators")
     c1, c2, c3 = st.columns(3)
@@ -58,65 +81,52 @@ def app():
     # 🥇  Top‑5 barplot
     # ------------------------------------------------------------------
     st.markdown("### 🥇 Top 5 departments most affected")
-    top5 = (
-        df.nlargest(5, "mortalite_65_plus")[["departement", "mortalite_65_plus"]]
-        .reset_index(drop=True)
-    )
+    top5 = kpis["top5"]
 
-    fig, ax = plt.subplots(figsize=(8, 4))
-    sns.barplot(
-        data=top5,
-        x="mortalite_65_plus",
-        y="departement",
-        hue="departement",
-        palette="Reds_d",
-        legend=False,
-        ax=ax,
+    fig, ax = get_fig("fig_top5_65plus", (8, 4))
+    ax.barh(
+        top5["departement"],
+        top5["mortalite_65_plus"],
+        color=colormaps["Reds"](np.linspace(0.5, 0.95, len(top5))),
     )
+    ax.invert_yaxis()
     ax.set_xlabel("Mortality rate (‰)")
     ax.set_ylabel("Department")
     ax.set_title("Top 5 mortality 65+")
     st.pyplot(fig)
-    plt.close(fig)
 
     # ------------------------------------------------------------------
     # 🔍  Mortality by vulnerability class
     # ------------------------------------------------------------------
     st.markdown("### 🔍 Mortality by overall vulnerability")
-    vuln_group = (
-        df.groupby("classe_vuln")["mortalite_65_plus"].mean().round(2)
-        .reindex(["Faible", "Moyenne", "Élevée", "Très élevée"])
-        .dropna()
-    )
+    vuln_group = kpis["vuln_group"]
     palette_vuln = {
         "Faible": "#A8E6A2",
-        "Moyenne": "#FFD580",
+        "Modérée": "#FFD580",
         "Élevée": "#FFA07A",
         "Très élevée": "#FF6347",
     }
 
-    fig2, ax2 = plt.subplots(figsize=(8, 5))
-    sns.barplot(
-        x=vuln_group.values,
-        y=vuln_group.index,
-        hue=vuln_group.index,
-        palette=[palette_vuln[k] for k in vuln_group.index],
-        legend=False,
-        ax=ax2,
+    fig2, ax2 = get_fig("fig_vuln_65plus", (8, 5))
+    ax2.barh(
+        vuln_group.index,
+        vuln_group.values,
+        color=[palette_vuln[k] for k in vuln_group.index],
     )
+    ax2.invert_yaxis()
     for i, v in enumerate(vuln_group.values):
         ax2.text(v + 0.3, i, f"{v} ‰", va="center", fontsize=10)
     ax2.set_title("Mortality rate 65+ by vulnerability class")
     ax2.set_xlabel("Mortality rate (‰)")
     ax2.set_ylabel("Vulnerability class")
-    sns.despine()
+    for side in ("top", "right"):
+        ax2.spines[side].set_visible(False)
     st.pyplot(fig2)
-    plt.close(fig2)
 
     # ------------------------------------------------------------------
     # 📈  Correlation
     # ------------------------------------------------------------------
-    corr_score = round(df["score_vuln_global"].corr(df["mortalite_65_plus"]), 3)
+    corr_score = kpis["corr_score"]
     st.markdown(
         f"**📈 Correlation: global vulnerability score / mortality 65+** : `{corr_score}`"
     )
@@ -128,32 +138,34 @@ def app():
     # ------------------------------------------------------------------
     # 🗺️  Maps in tabs
     # ------------------------------------------------------------------
-    geo_path = os.path.join(os.path.dirname(__file__), "..", "data", "departements.geojson")
     st.markdown("### 🗺️ Maps")
 
-    tab1, tab2, tab3 = st.tabs(["65+ mortality", "APL & Poverty", "Combined score"])
+    codes = tuple(df["code_dep"])
+    # Tab-like selector: unlike st.tabs, only the active map is built and sent
+    active = st.radio(
+        "Map",
+        ["65+ mortality", "APL & Poverty", "Combined score"],
+        horizontal=True,
+        key="tab65",
+        label_visibility="collapsed",
+    )
 
     # ----- Tab 1 : Mortality map ---------------------------------------
-    with tab1:
+    if active == "65+ mortality":
         try:
-            m_mort = folium.Map(location=[46.5, 2.2], zoom_start=6)
-            folium.Choropleth(
-                geo_data=geo_path,
-                data=df,
-                columns=["code_dep", "mortalite_65_plus"],
-                key_on="feature.properties.code",
-                fill_color="YlOrRd",
-                fill_opacity=0.7,
-                line_opacity=0.2,
-                legend_name="Mortality rate of 65+ (‰)",
-            ).add_to(m_mort)
-            st_folium(m_mort, width=700, height=MAP_HEIGHT)
+            html = build_choropleth_html(
+                codes,
+                tuple(df["mortalite_65_plus"]),
+                "YlOrRd",
+                "Mortality rate of 65+ (‰)",
+            )
+            components.html(html, width=700, height=MAP_HEIGHT)
         except Exception as e:
             st.error("❌ Unable to display the mortality map")
             st.exception(e)
 
     # ----- Tab 2 : APL & Poverty map -----------------------------------
-    with tab2:
+    elif active == "APL & Poverty":
         var_options = {
             "APL Doctors": "apl_med",
             "APL Nurses": "apl_inf",
@@ -172,25 +184,20 @@ def app():
             color, thresholds = "YlOrRd", None
 
         try:
-            m_var = folium.Map(location=[46.5, 2.2], zoom_start=6)
-            folium.Choropleth(
-                geo_data=geo_path,
-                data=df,
-                columns=["code_dep", selected_column],
-                key_on="feature.properties.code",
-                fill_color=color,
-                fill_opacity=0.7,
-                line_opacity=0.2,
-                threshold_scale=thresholds,
-                legend_name=f"{selected_label} (critical = red | favorable = green)",
-            ).add_to(m_var)
-            st_folium(m_var, width=700, height=MAP_HEIGHT)
+            html = build_choropleth_html(
+                codes,
+                tuple(df[selected_column]),
+                color,
+                f"{selected_label} (critical = red | favorable = green)",
+                tuple(thresholds) if thresholds is not None else None,
+            )
+            components.html(html, width=700, height=MAP_HEIGHT)
         except Exception as e:
             st.error("❌ Map not available")
             st.exception(e)
 
     # ----- Tab 3 : Combined senior vulnerability score -----------------
-    with tab3:
+    else:
         st.markdown("#### 📺 Combined senior health vulnerability score")
         st.markdown(
             "This score aggregates mortality 65+, poverty, and access to healthcare "
@@ -198,50 +205,30 @@ def app():
             "are inverted before aggregation."
         )
 
-        # 1️⃣ Z‑score normalisation and inversion of APL metrics
-        features = ["mortalite_65_plus", "apl_med", "apl_inf", "taux_pauvrete"]
-        scaler = StandardScaler()
-        z_values = scaler.fit_transform(df[features])
-        df_z = pd.DataFrame(z_values, columns=[f"{col}_z" for col in features])
-        df_z["code_dep"] = df["code_dep"]
-        df_z["apl_med_z"] *= -1
-        df_z["apl_inf_z"] *= -1
-
-        # 2️⃣ Aggregate to combined score (higher = worse)
-        score_cols = [
-            "mortalite_65_plus_z",
-            "apl_med_z",
-            "apl_inf_z",
-            "taux_pauvrete_z",
-        ]
-        df_z["score_senior"] = df_z[score_cols].sum(axis=1).round(3)
-
-        # 3️⃣ Merge for mapping
-        df_map = df.merge(df_z[["code_dep", "score_senior"]], on="code_dep")
-
-        # 4️⃣ Folium choropleth
+        # 1️⃣ Z‑scores with APL metrics inverted, 2️⃣ summed (higher = worse)
+        signs = [1, -1, -1, 1]  # mortality, APL doctors, APL nurses, poverty
+        df["score_senior"] = vulnerability_score(df[SENIOR_COLS].to_numpy(), signs).round(3)
+
+        # 3️⃣ Folium choropleth
         try:
-            m_comb = folium.Map(location=[46.5, 2.2], zoom_start=6)
-            folium.Choropleth(
-                geo_data=geo_path,
-                data=df_map,
-                columns=["code_dep", "score_senior"],
-                key_on="feature.properties.code",
-                fill_color="YlOrRd",
-                fill_opacity=0.7,
-                line_opacity=0.2,
-                legend_name="Combined senior health vulnerability score (higher = worse)",
-            ).add_to(m_comb)
-            st_folium(m_comb, width=700, height=MAP_HEIGHT)
+            html = build_choropleth_html(
+                codes,
+                tuple(df["score_senior"]),
+                "YlOrRd",
+                "Combined senior health vulnerability score (higher = worse)",
+            )
+            components.html(html, width=700, height=MAP_HEIGHT)
         except Exception as e:
             st.error("❌ Combined map not available")
             st.exception(e)
 
-        # 5️⃣ Table: top 10 most vulnerable departments
+        # 4️⃣ Table: top 10 most vulnerable departments
         st.markdown("##### 🏆 Top 10 most vulnerable departments")
-        top10 = (
-            df_map[["departement", "score_senior"]]
-            .nlargest(10, "score_senior")
-            .reset_index(drop=True)
+        # index is hidden anyway; float32 halves the score bytes sent to the browser
+        top10 = df[["departement", "score_senior"]].nlargest(10, "score_senior")
+        top10["score_senior"] = top10["score_senior"].astype("float32")
+        st.dataframe(
+            top10,
+            hide_index=True,
+            column_config={"score_senior": st.column_config.NumberColumn(format="%.3f")},
         )
-        st.dataframe(top10, hide_index=True)
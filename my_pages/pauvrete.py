@@ -1,12 +1,64 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import os
-from scipy.stats import pearsonr
+import numpy as np
+from utils.data import load_vuln_df, VULN_PARQUET
+from utils.figures import get_fig
+
+
+@st.cache_data(show_spinner=False)
+def indicator_kpis(path, cols, thresholds, lower_is_vuln):
+    """KPIs and top 5 for all indicators at once, computed once per data file.
+
+    Returns ``{col: (avg, best_dep, worst_dep, gap, vuln_count, top5)}``;
+    ``lower_is_vuln`` holds True where low values mean vulnerability (APL).
+    """
+    df = load_vuln_df(path)
+    mat = df[list(cols)].to_numpy()
+    lower = np.asarray(lower_is_vuln)
+
+    # NaN-aware, like the pandas mean/idxmax/idxmin they replace
+    means = np.nanmean(mat, axis=0)
+    imax, imin = np.nanargmax(mat, axis=0), np.nanargmin(mat, axis=0)
+    vuln_counts = np.where(lower, mat < thresholds, mat > thresholds).sum(axis=0)
+    # most vulnerable first; stable sort keeps nsmallest/nlargest tie order
+    top_rows = np.argsort(np.where(lower, mat, -mat), axis=0, kind="stable")[:5]
+
+    kpis = {}
+    for j, col_id in enumerate(cols):
+        dep_max, dep_min = df.iloc[imax[j]], df.iloc[imin[j]]
+        # high value = good accessibility / low poverty
+        best_dep, worst_dep = (dep_max, dep_min) if lower[j] else (dep_min, dep_max)
+        kpis[col_id] = (
+            round(means[j], 2),
+            best_dep,
+            worst_dep,
+            round(best_dep[col_id] - worst_dep[col_id], 2),
+            int(vuln_counts[j]),
+            df.iloc[top_rows[:, j]][["departement", col_id]],
+        )
+    return kpis
+
+
+@st.cache_data(show_spinner=False)
+def corr_pauvrete(path):
+    """Pearson (r, p) between nurse APL and poverty rate."""
+    from scipy.stats import t as student_t
+
+    df = load_vuln_df(path)
+    x, y = df["apl_inf"].to_numpy(), df["taux_pauvrete"].to_numpy()
+    mask = ~(np.isnan(x) | np.isnan(y))
+    n = int(mask.sum())
+    r = np.corrcoef(x[mask], y[mask])[0, 1]
+
+    # two-sided p-value from the Student t distribution with n - 2 dof
+    tstat = r * np.sqrt((n - 2) / (1 - r * r))
+    p = 2 * student_t.sf(abs(tstat), n - 2)
+    return float(r), float(p)
 
 
 def app():
+    from matplotlib import colormaps
+    import seaborn as sns
+
     st.title("🏥 APL & Poverty Analysis")
     st.markdown(
         "Analysis of health accessibility (APL) and poverty indicators across French departments (2022)."
@@ -15,10 +67,7 @@ def app():
     # ------------------------------------------------------------------
     # Load data
     # ------------------------------------------------------------------
-    data_path = os.path.join(
-        os.path.dirname(__file__), "..", "data", "dept_vulnerabilite_2022.csv"
-    )
-    df = pd.read_csv(data_path)
+    df = load_vuln_df(VULN_PARQUET)
 
     # ------------------------------------------------------------------
     # Variable‑specific configuration
@@ -53,6 +102,13 @@ def app():
     # Create one tab per indicator
     tabs = st.tabs(list(var_config.keys()))
 
+    kpis = indicator_kpis(
+        VULN_PARQUET,
+        tuple(cfg["col"] for cfg in var_config.values()),
+        tuple(cfg["threshold"] for cfg in var_config.values()),
+        tuple(cfg["direction"] == "lower" for cfg in var_config.values()),
+    )
+
     # ------------------------------------------------------------------
     # Iterate over tabs / indicators
     # ------------------------------------------------------------------
@@ -60,28 +116,7 @@ def app():
         with tab:
             cfg = var_config[tab_label]
             col_id = cfg["col"]
-            values = df[col_id]
-
-            # ---------------- KPI values ----------------
-            avg = round(values.mean(), 2)
-            dep_max = df.loc[values.idxmax()]
-            dep_min = df.loc[values.idxmin()]
-
-            # best/worst depend on direction (lower = vulnerability)
-            if cfg["direction"] == "lower":
-                best_dep = dep_max  # high value = good accessibility / low poverty
-                worst_dep = dep_min
-            else:
-                best_dep = dep_min
-                worst_dep = dep_max
-
-            gap = round(best_dep[col_id] - worst_dep[col_id], 2)
-
-            # Vulnerable departments count
-            if cfg["direction"] == "lower":
-                vuln_count = df[df[col_id] < cfg["threshold"]].shape[0]
-            else:
-                vuln_count = df[df[col_id] > cfg["threshold"]].shape[0]
+            avg, best_dep, worst_dep, gap, vuln_count, top5 = kpis[col_id]
 
             # ---------------- Display KPIs ----------------
             st.subheader(f"📊 Key indicators – {tab_label}")
@@ -100,34 +135,24 @@ def app():
             col4.metric("Gap (best–worst)", cfg["fmt"].format(gap) + cfg["unit"])
             col5.metric("Vulnerable depts", vuln_count)
 
-            # ---------------- Top‑5 bar chart (Seaborn ≥0.14 compliant) ----------------
+            # ---------------- Top‑5 bar chart ----------------
             st.markdown("### 🥇 Top 5 departments most vulnerable")
-            if cfg["direction"] == "lower":
-                top5 = df.nsmallest(5, col_id)[["departement", col_id]]
-            else:
-                top5 = df.nlargest(5, col_id)[["departement", col_id]]
-
-            fig, ax = plt.subplots(figsize=(8, 4))
-            sns.barplot(
-                data=top5,
-                x=col_id,
-                y="departement",
-                hue="departement",
-                palette="Reds",
-                legend=False,
-                ax=ax,
+            fig, ax = get_fig(f"fig_top5_{col_id}", (8, 4))
+            ax.barh(
+                top5["departement"],
+                top5[col_id],
+                color=colormaps["Reds"](np.linspace(0, 1, len(top5) + 2)[1:-1]),
             )
+            ax.invert_yaxis()
             ax.set_xlabel(tab_label)
             ax.set_ylabel("Department")
             ax.set_title(f"Top 5 – {tab_label}")
-            if ax.get_legend() is not None:
-                ax.get_legend().remove()
             st.pyplot(fig)
 
     # ------------------------------------------------------------------
   
     st.header("📈 Correlation: Poverty rate vs APL ")
-    fig_inf, ax_inf = plt.subplots(figsize=(8, 6))
+    fig_inf, ax_inf = get_fig("fig_corr_pauvrete", (8, 6))
     sns.regplot(
         data=df,
         x="apl_inf",
@@ -139,7 +164,6 @@ def app():
     ax_inf.set_ylabel("Poverty rate (%)")
     ax_inf.set_title("Correlation between poverty rate and nurses accessibility (2022)")
 
-    r_inf, p_inf = pearsonr(df["apl_inf"], df["taux_pauvrete"])
+    r_inf, p_inf = corr_pauvrete(VULN_PARQUET)
     st.pyplot(fig_inf)
-    plt.close(fig_inf)
     st.markdown(f"**Pearson r = {r_inf:.2f}** (p = {p_inf:.3f})")
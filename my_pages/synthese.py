@@ -6,21 +6,30 @@ Couleurs inversées : **rouge = favorable**, **vert = critique**.
 
 import streamlit as st
 import pandas as pd
-import geopandas as gpd
-import pydeck as pdk
+import numpy as np
 from pathlib import Path
-import matplotlib.cm as cm
+from functools import lru_cache
 import re
 
+_WS_RE = re.compile(r"\s+")  # espaces parasites dans les codes département
+
 # ────────────────────────────────────────────────────────────────────────
 # 1. Chargement des données
 # ────────────────────────────────────────────────────────────────────────
 @st.cache_data
 def load_geo():
-    g = gpd.read_file(Path("data") / "departements.geojson")[["code", "nom", "geometry"]]
+    import geopandas as gpd
+    import pyproj
+
+    # Polygones déjà simplifiés hors ligne (scripts/simplify_geojson.py)
+    # Lecteur colonnaire pyogrio (Arrow), limité aux colonnes utiles
+    g = gpd.read_file(Path("data") / "departements_simple.geojson",
+                      engine="pyogrio", use_arrow=True, columns=["code", "nom"])
     g["code"] = g["code"].astype(str).str.upper()
-    if g.crs is None or g.crs.to_epsg() != 4326:
-        g = g.to_crs(epsg=4326)
+    # Comparaison directe des CRS : to_epsg() interrogerait la base PROJ
+    wgs84 = pyproj.CRS.from_epsg(4326)
+    if g.crs is None or not g.crs.equals(wgs84):
+        g = g.to_crs(wgs84)
     return g
 
 
@@ -36,81 +45,132 @@ def load_ind():
         "mortalite_0_64": "mort_premat" # mortalité prématurée
     })
     # Nettoie codes → format à 2 caractères, majuscules
-    df["code"] = df["code"].apply(
-        lambda c: re.sub(r"\s+", "", str(c)).upper().zfill(2)
-        if str(c).isdigit() and len(str(c)) == 1 else str(c).upper()
-    )
+    code = df["code"].str.replace(_WS_RE, "", regex=True).str.upper()
+    df["code"] = code.where(~code.str.fullmatch(r"\d"), code.str.zfill(2))
+
+    # Bornes de l'échelle des barres, calculées une fois avec les données
+    df.attrs["mort_bounds"] = (float(df["mort_premat"].min()),
+                               float(df["mort_premat"].max()))
     return df
 
 
+@st.cache_data(show_spinner=False)
+def _prepare():
+    """Fusion géo + indicateurs, centroïdes et GeoJSON : tout ce qui ne dépend
+    pas de l'indicateur choisi, calculé une fois par processus."""
+    import shapely
+    import shapely.geometry
+
+    ind = load_ind()
+    gdf = load_geo().merge(ind, on="code", how="left")
+
+    # Centroïdes pour positionner les barres, calculés directement sur la
+    # géométrie WGS84 garantie par load_geo : aucune reprojection des polygones
+    # (écart < 400 m avec un calcul en Lambert‑93, invisible à cette échelle)
+    cent = shapely.centroid(gdf.geometry.to_numpy())
+    gdf["lon"], gdf["lat"] = shapely.get_x(cent), shapely.get_y(cent)
+
+    # Surface : géométrie seule (ni propriétés ni bbox), fill_color y est
+    # injecté par _build_deck ; les valeurs du tooltip viennent des barres
+    geojson = {"type": "FeatureCollection", "features": [
+        {"type": "Feature", "geometry": shapely.geometry.mapping(geom), "properties": {}}
+        for geom in gdf.geometry.to_numpy()
+    ]}
+
+    return gdf, geojson, *ind.attrs["mort_bounds"]
+
+
 # ────────────────────────────────────────────────────────────────────────
 # 2. Palette discrète selon seuils
 # ────────────────────────────────────────────────────────────────────────
 
-def classify_color(values, thresholds, cmap_name, reverse=False):
-    """Associe chaque valeur à une couleur RGBA selon des classes discrètes."""
-    cmap = cm.get_cmap(cmap_name + ("_r" if reverse else ""))
-    n_cls = len(thresholds) + 1
-    bounds = [-float("inf")] + thresholds + [float("inf")]
+@lru_cache(maxsize=16)
+def _palette(cmap_name, reverse, n_cls):
+    """Palette RGBA uint8 de n_cls couleurs (+ transparent pour les NaN)."""
+    from matplotlib import colormaps
 
+    cmap = colormaps[cmap_name + ("_r" if reverse else "")]
     # Couleurs prélevées régulièrement dans la cmap
-    color_steps = [cmap(i / (n_cls - 1)) for i in range(n_cls)]
+    palette = np.array(
+        [[int(r * 255), int(g * 255), int(b * 255), 220]
+         for r, g, b, _ in (cmap(i / (n_cls - 1)) for i in range(n_cls))]
+        + [[0, 0, 0, 0]],
+        dtype=np.uint8,
+    )
+    palette.setflags(write=False)  # partagée entre les appels
+    return palette
+
+
+def classify_color(values, thresholds, cmap_name, reverse=False):
+    """Associe chaque valeur à une couleur RGBA selon des classes discrètes.
 
-    def get_color(v):
-        for i in range(n_cls):
-            if bounds[i] < v <= bounds[i + 1]:
-                r, g, b, a = color_steps[i]
-                return [int(r * 255), int(g * 255), int(b * 255), 220]
-        return [0, 0, 0, 0]
+    Renvoie un tableau uint8 (n, 4) contigu, une ligne par valeur."""
+    n_cls = len(thresholds) + 1
+    palette = _palette(cmap_name, reverse, n_cls)
 
-    return values.apply(get_color)
+    # Classe i  ⇔  thresholds[i-1] < v <= thresholds[i]
+    v = np.asarray(values, dtype=float)
+    idx = np.searchsorted(np.asarray(thresholds, dtype=float), v, side="left")
+    idx = np.where(np.isnan(v), n_cls, idx)
+    return np.ascontiguousarray(palette[idx])
 
 
 # ────────────────────────────────────────────────────────────────────────
-# 3. Application Streamlit
+# 3. Carte Deck.gl (une variante par indicateur)
 # ────────────────────────────────────────────────────────────────────────
 
-def app():
-    st.title("🗺️ Carte APL + mortalité prématurée (barres 3‑D)")
+# Indicateurs proposés pour la surface : (colonne, libellé)
+INDICATEURS = [("apl_med", "APL médecins"), ("apl_inf", "APL infirmiers"),
+               ("taux_pauvrete", "Taux de pauvreté")]
+
+# Tooltip des barres, un gabarit deck.gl par indicateur de surface
+TOOLTIP_TEMPLATES = {
+    col: f"<b>{{nom}}</b><br/>{label} : {{{col}}}<br/>Mortalité prématurée : {{mort_premat}} ‰"
+    for col, label in INDICATEURS
+}
+
+# Palettes & seuils (couleurs inversées : rouge = favorable, vert = critique)
+SURFACE_STYLES = {
+    "apl_med":       ("RdYlGn", [1.9, 2.5, 3, 3.5, 4.5, 5.2], False),  # plus de reverse ➜ rouge=favor.
+    "apl_inf":       ("RdYlGn", [60, 100, 150, 200, 250, 300], False),
+    "taux_pauvrete": ("YlOrRd", [9, 13, 17, 21, 25, 30], True),       # reverse ➜ rouge=favor.
+}
+
+MAX_H = 100_000  # hauteur max des barres : 100 km en "vrai" Deck.gl
 
-    # Choix de l'indicateur pour la surface
-    col_id = st.selectbox(
-        "Indicateur pour la surface :",
-        options=[("apl_med", "APL médecins"), ("apl_inf", "APL infirmiers"),
-                 ("taux_pauvrete", "Taux de pauvreté")],
-        format_func=lambda x: x[1]
-    )[0]
 
-    # Palettes & seuils (couleurs inversées : rouge = favorable, vert = critique)
-    if col_id == "apl_med":
-        palette, thr, reverse = "RdYlGn", [1.9, 2.5, 3, 3.5, 4.5, 5.2], False  # plus de reverse ➜ rouge=favor.
-    elif col_id == "apl_inf":
-        palette, thr, reverse = "RdYlGn", [60, 100, 150, 200, 250, 300], False
-    else:  # taux de pauvreté
-        palette, thr, reverse = "YlOrRd", [9, 13, 17, 21, 25, 30], True        # reverse ➜ rouge=favor.
+@st.cache_resource(show_spinner=False)
+def _build_deck(col_id):
+    """Deck complet pour un indicateur de surface : 3 variantes au plus,
+    construites une fois puis réutilisées à chaque rerun."""
+    import orjson
+    import pydeck as pdk
+    from pydeck.bindings.json_tools import default_serialize
 
-    # Fusion données géographiques + indicateurs
-    gdf = load_geo().merge(load_ind(), on="code", how="left")
+    palette, thr, reverse = SURFACE_STYLES[col_id]
+
+    # Fusion données géographiques + indicateurs (mise en cache)
+    gdf, geojson, mort_min, mort_max = _prepare()
 
     # Couleur discrète sur la surface
-    gdf["fill_color"] = classify_color(gdf[col_id], thr, palette, reverse)
+    fill = classify_color(gdf[col_id], thr, palette, reverse)
 
     # Hauteur des barres (mortalité prématurée)
-    MAX_H = 100_000  # 100 km en "vrai" Deck.gl
-    mort_min, mort_max = gdf["mort_premat"].min(), gdf["mort_premat"].max()
-    gdf["bar_elev"] = (gdf["mort_premat"] - mort_min) / (mort_max - mort_min) * MAX_H
-
-    # Centroïdes (WGS84) pour positionner les barres
-    cent_l93 = gdf.to_crs(2154).centroid
-    gdf["lon"], gdf["lat"] = (
-        gpd.GeoSeries(cent_l93, crs=2154).to_crs(4326).x,
-        gpd.GeoSeries(cent_l93, crs=2154).to_crs(4326).y,
-    )
+    mort = gdf["mort_premat"].to_numpy(dtype=float)
+    gdf["bar_elev"] = (mort - mort_min) * (MAX_H / (mort_max - mort_min))
+
+    # Seule la couleur change d'un indicateur à l'autre : copie superficielle
+    # des features avec fill_color (listes Python seulement ici, pour le JSON),
+    # la géométrie n'est pas recopiée
+    geojson = {**geojson, "features": [
+        {**f, "properties": {**f["properties"], "fill_color": c}}
+        for f, c in zip(geojson["features"], fill.tolist())
+    ]}
 
     # Couche surface (départements)
     poly_layer = pdk.Layer(
         "GeoJsonLayer",
-        data=gdf.__geo_interface__,
+        data=geojson,
         stroked=True,
         get_line_color="[80,80,80]",
         line_width_min_pixels=0.5,
@@ -119,26 +179,24 @@ def app():
         pickable=False,
     )
 
-    # Couche barres cylindriques
+    # Couche barres cylindriques : seules les colonnes utiles (position,
+    # hauteur, tooltip) sont envoyées, pas la géométrie des départements
+    bars_df = gdf[["lon", "lat", "bar_elev", "nom", "mort_premat", col_id]].copy()
     column_layer = pdk.Layer(
         "ColumnLayer",
-        data=gdf,
+        data=bars_df,
         get_position="[lon, lat]",
         get_elevation="bar_elev",
         elevation_scale=1,
         radius=8_000,
+        extruded=True,
+        disk_resolution=12,  # 12 faces suffisent à cette échelle (20 par défaut)
+        stroked=False,
         get_fill_color="[190,190,190,190]",
         pickable=True,
         auto_highlight=True,
     )
 
-    # Légende sous le titre
-    palette_name = palette + (" inversé" if reverse else "")
-    st.markdown(
-        f"*Surface : palette **{palette_name}** – seuils {thr}*  \n"
-        f"*Barres : hauteur → mortalité prématurée (0 → {MAX_H/1000:.0f} km)*"
-    )
-
     # Carte Deck.gl
     deck = pdk.Deck(
         layers=[poly_layer, column_layer],
@@ -147,13 +205,42 @@ def app():
             latitude=46.6, longitude=2.5, zoom=5.2, pitch=65, bearing=15
         ),
         tooltip={
-            "html": (
-                "<b>{nom}</b><br/>"
-                f"{col_id} : {{{col_id}}}<br/>"
-                "Mortalité prématurée : {mort_premat} ‰"
-            ),
+            "html": TOOLTIP_TEMPLATES[col_id],
             "style": {"max-width": "220px"}
         }
     )
 
-    st.pydeck_chart(deck, use_container_width=True)
+    # st.pydeck_chart rappelle deck.to_json() à chaque rerun (json.dumps indenté
+    # de ~100 polygones) : on sérialise une seule fois, avec orjson, et on fige
+    # le résultat sur ce deck mis en cache
+    payload = orjson.dumps(
+        deck, default=default_serialize, option=orjson.OPT_SORT_KEYS
+    ).decode()
+    deck.to_json = lambda: payload
+    return deck
+
+
+# ────────────────────────────────────────────────────────────────────────
+# 4. Application Streamlit
+# ────────────────────────────────────────────────────────────────────────
+
+def app():
+    st.title("🗺️ Carte APL + mortalité prématurée (barres 3‑D)")
+
+    # Choix de l'indicateur pour la surface
+    col_id = st.selectbox(
+        "Indicateur pour la surface :",
+        options=INDICATEURS,
+        format_func=lambda x: x[1]
+    )[0]
+
+    palette, thr, reverse = SURFACE_STYLES[col_id]
+
+    # Légende sous le titre
+    palette_name = palette + (" inversé" if reverse else "")
+    st.markdown(
+        f"*Surface : palette **{palette_name}** – seuils {thr}*  \n"
+        f"*Barres : hauteur → mortalité prématurée (0 → {MAX_H/1000:.0f} km)*"
+    )
+
+    st.pydeck_chart(_build_deck(col_id), use_container_width=True)
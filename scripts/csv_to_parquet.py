@@ -0,0 +1,19 @@
+"""
+One-shot build step: snapshot data/dept_vulnerabilite_2022.csv to Parquet so
+the app reads typed columns instead of re-tokenising the CSV.
+
+    python scripts/csv_to_parquet.py
+"""
+
+import os
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+SRC = os.path.join(DATA_DIR, "dept_vulnerabilite_2022.csv")
+DST = os.path.join(DATA_DIR, "dept_vulnerabilite_2022.parquet")
+
+
+if __name__ == "__main__":
+    df = pd.read_csv(SRC, dtype={"code_dep": str})
+    df.to_parquet(DST, engine="pyarrow", compression="zstd", index=False)
+    print(f"{SRC} -> {DST} ({len(df)} rows)")
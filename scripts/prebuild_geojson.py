@@ -0,0 +1,23 @@
+"""
+One-shot build step: parse data/departements_simple.geojson (see
+simplify_geojson.py) once and pickle the dict next to it, so the app never goes
+through the pure-Python JSON parser.
+
+    python scripts/prebuild_geojson.py
+"""
+
+import json
+import os
+import pickle
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+SRC = os.path.join(DATA_DIR, "departements_simple.geojson")
+DST = os.path.join(DATA_DIR, "departements.pkl")
+
+
+if __name__ == "__main__":
+    with open(SRC, "r", encoding="utf-8") as f:
+        geojson = json.load(f)
+    with open(DST, "wb") as f:
+        pickle.dump(geojson, f, protocol=5)
+    print(f"{SRC} -> {DST} ({len(geojson['features'])} features)")
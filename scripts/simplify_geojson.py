@@ -0,0 +1,51 @@
+"""
+One-shot build step: simplify department polygons for display at department
+zoom levels and write data/departements_simple.geojson.
+
+Uses coverage simplification so neighbouring departments keep shared borders
+(no slivers or gaps); requires geopandas >= 1.1 with GEOS >= 3.12. Islands and
+other detached parts smaller than MIN_PART_RATIO of their department's largest
+part are then dropped (sub-pixel at zoom 5-6); parts touching another
+department (enclaves) are kept so no hole opens in the neighbour.
+
+    python scripts/simplify_geojson.py
+    python scripts/prebuild_geojson.py   # refresh the pickled copy
+"""
+
+import os
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+SRC = os.path.join(DATA_DIR, "departements.geojson")
+DST = os.path.join(DATA_DIR, "departements_simple.geojson")
+TOLERANCE = 0.005  # degrees, ~500 m: invisible at zoom 5-6
+MIN_PART_RATIO = 0.01  # of the department's largest part, by area
+
+
+def drop_small_parts(geoms):
+    """Drop detached polygon parts below MIN_PART_RATIO, except enclaves."""
+    parts = geoms.explode(index_parts=True)
+    dept = parts.index.get_level_values(0).to_numpy()
+    # Ratios within one department, so degree² areas are good enough
+    area = shapely.area(parts.to_numpy())
+    largest = pd.Series(area).groupby(dept).transform("max").to_numpy()
+    big = area >= MIN_PART_RATIO * largest
+
+    # Parts touching another department are enclaves: keep them
+    tree = shapely.STRtree(geoms.to_numpy())
+    part_i, geom_i = tree.query(parts.to_numpy(), predicate="intersects")
+    touches = np.zeros(len(parts), dtype=bool)
+    touches[part_i[geoms.index.to_numpy()[geom_i] != dept[part_i]]] = True
+
+    kept = gpd.GeoDataFrame(geometry=parts[big | touches])
+    return kept.dissolve(level=0).geometry.reindex(geoms.index)
+
+
+if __name__ == "__main__":
+    g = gpd.read_file(SRC)
+    g["geometry"] = drop_small_parts(g.geometry.simplify_coverage(tolerance=TOLERANCE))
+    g.to_file(DST, driver="GeoJSON", COORDINATE_PRECISION=5)
+    print(f"{SRC} -> {DST} ({len(g)} features)")
@@ -0,0 +1,26 @@
+import streamlit as st
+import pandas as pd
+import pickle
+import os
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+# Parquet snapshot of dept_vulnerabilite_2022.csv, built by scripts/csv_to_parquet.py
+VULN_PARQUET = os.path.join(DATA_DIR, "dept_vulnerabilite_2022.parquet")
+# Pickled copy of departements_simple.geojson, built by scripts/prebuild_geojson.py
+GEOJSON_PKL = os.path.join(DATA_DIR, "departements.pkl")
+VULN_CLASSES = ["Faible", "Modérée", "Élevée", "Très élevée"]
+
+
+@st.cache_data(show_spinner=False)
+def load_vuln_df(path):
+    """Department vulnerability table, read once per process."""
+    df = pd.read_parquet(path)
+    df["classe_vuln"] = pd.Categorical(df["classe_vuln"], categories=VULN_CLASSES, ordered=True)
+    return df
+
+
+@st.cache_resource
+def load_geojson_pickle(path):
+    """Department GeoJSON dict, shared by reference (never hashed or copied)."""
+    with open(path, "rb") as f:
+        return pickle.load(f)
@@ -0,0 +1,17 @@
+import streamlit as st
+
+
+def get_fig(key, figsize):
+    """Session-scoped Figure/Axes pair, cleared and redrawn instead of rebuilt.
+
+    Figures are created outside pyplot, so nothing is left in its global registry
+    and they must not be passed to ``plt.close``.
+    """
+    from matplotlib.figure import Figure
+
+    if key not in st.session_state:
+        fig = Figure(figsize=figsize)
+        st.session_state[key] = (fig, fig.subplots())
+    fig, ax = st.session_state[key]
+    ax.cla()
+    return fig, ax
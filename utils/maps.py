@@ -0,0 +1,42 @@
+import streamlit as st
+import pandas as pd
+from utils.data import load_geojson_pickle, GEOJSON_PKL
+
+
+@st.cache_data(show_spinner=False)
+def build_choropleth_html(codes, values, fill_color, legend_name, thresholds=None,
+                          tooltip=False):
+    """Department choropleth rendered to standalone HTML, once per argument set.
+
+    ``codes``/``values``/``thresholds`` are tuples so the cache key stays cheap to hash.
+    ``tooltip=True`` adds a hover tooltip with the department name and its value.
+    """
+    import folium
+
+    geo_data = load_geojson_pickle(GEOJSON_PKL)
+    if tooltip:
+        # shallow copy with the value as a feature property; the shared dict stays untouched
+        by_code = dict(zip(codes, values))
+        geo_data = {**geo_data, "features": [
+            {**f, "properties": {**f["properties"], "value": by_code.get(f["properties"]["code"])}}
+            for f in geo_data["features"]
+        ]}
+
+    data = pd.DataFrame({"code_dep": codes, "value": values})
+    m = folium.Map(location=[46.5, 2.2], zoom_start=6)
+    choropleth = folium.Choropleth(
+        geo_data=geo_data,
+        data=data,
+        columns=["code_dep", "value"],
+        key_on="feature.properties.code",
+        fill_color=fill_color,
+        fill_opacity=0.7,
+        line_opacity=0.2,
+        threshold_scale=list(thresholds) if thresholds is not None else None,
+        legend_name=legend_name,
+    ).add_to(m)
+    if tooltip:
+        folium.GeoJsonTooltip(
+            fields=["nom", "value"], aliases=["Department", legend_name]
+        ).add_to(choropleth.geojson)
+    return m.get_root().render()
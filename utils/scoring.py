@@ -0,0 +1,17 @@
+import numpy as np
+
+
+def vulnerability_score(feats, signs, weights=None):
+    """Weighted sum of signed z-scores per department.
+
+    ``feats`` is an (n_depts, n_indicators) array; ``signs`` is +1/-1 per indicator
+    (-1 where a high value is favourable, e.g. APL). ``weights`` is either one
+    weight per indicator or an (n_weightsets, n_indicators) array for sensitivity
+    runs, in which case the result is (n_depts, n_weightsets).
+    """
+    feats = np.asarray(feats, dtype=np.float64)
+    z = (feats - feats.mean(axis=0)) / feats.std(axis=0)
+    coefs = np.asarray(signs, dtype=np.float64)
+    if weights is not None:
+        coefs = coefs * np.asarray(weights, dtype=np.float64)
+    return z @ coefs.T